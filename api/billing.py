@@ -9,8 +9,9 @@ import stripe
 import os
 import logging
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Mapping, Optional
 from enum import Enum
+from types import MappingProxyType
 import json
 
 from .database import get_database
@@ -48,6 +49,41 @@ STRIPE_PRICE_IDS = {
 }
 
 
+# Usage limits per subscription tier. Static, so built once and shared
+# read-only; get_usage_limits hands out copies.
+TIER_USAGE_LIMITS = {
+    "starter": MappingProxyType({
+        "users": 2,
+        "simulations_per_month": 50,
+        "max_iterations": 50000,
+        "pdf_downloads": 10,
+        "api_calls_per_hour": 100,
+        "optimization_runs": 5
+    }),
+    "pro": MappingProxyType({
+        "users": 10,
+        "simulations_per_month": 500,
+        "max_iterations": 500000,
+        "pdf_downloads": 100,
+        "api_calls_per_hour": 1000,
+        "optimization_runs": 100
+    }),
+    "enterprise": MappingProxyType({
+        "users": 25,
+        "simulations_per_month": -1,  # Unlimited
+        "max_iterations": -1,
+        "pdf_downloads": -1,
+        "api_calls_per_hour": 10000,
+        "optimization_runs": -1
+    })
+}
+
+
+def _tier_limits(tier: str) -> Mapping[str, int]:
+    """Shared read-only limits for a tier, falling back to starter."""
+    return TIER_USAGE_LIMITS.get(tier, TIER_USAGE_LIMITS["starter"])
+
+
 class SubscriptionTier(str, Enum):
     """Subscription tier enumeration."""
     STARTER = "starter"
@@ -73,34 +109,7 @@ class BillingService:
         Returns:
             Usage limits dictionary
         """
-        limits = {
-            "starter": {
-                "users": 2,
-                "simulations_per_month": 50,
-                "max_iterations": 50000,
-                "pdf_downloads": 10,
-                "api_calls_per_hour": 100,
-                "optimization_runs": 5
-            },
-            "pro": {
-                "users": 10,
-                "simulations_per_month": 500,
-                "max_iterations": 500000,
-                "pdf_downloads": 100,
-                "api_calls_per_hour": 1000,
-                "optimization_runs": 100
-            },
-            "enterprise": {
-                "users": 25,
-                "simulations_per_month": -1,  # Unlimited
-                "max_iterations": -1,
-                "pdf_downloads": -1,
-                "api_calls_per_hour": 10000,
-                "optimization_runs": -1
-            }
-        }
-
-        return limits.get(tier, limits["starter"])
+        return dict(_tier_limits(tier))
 
     async def check_usage_limit(
             self,
@@ -118,8 +127,8 @@ class BillingService:
         Returns:
             True if within limits, False if exceeded
         """
-        limits = await self.get_usage_limits(tier)
-        limit = limits.get(usage_type)
+        # Read-only lookup; no need for the copy get_usage_limits hands out
+        limit = _tier_limits(tier).get(usage_type)
 
         if limit == -1:  # Unlimited
             return True
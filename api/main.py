@@ -83,6 +83,15 @@ async def startup_event():
     logger.info("Application startup complete")
 
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush pending writes on shutdown"""
+    try:
+        await get_threat_intelligence_engine().flush_vulnerability_reports()
+    except Exception as e:
+        logger.error(f"Failed to flush vulnerability reports: {e}")
+
+
 @app.get("/")
 async def root():
     """Health check endpoint."""
@@ -13,9 +13,10 @@ from datetime import datetime
 from pathlib import Path
 import tempfile
 import json
+from functools import lru_cache
 
 try:
-    from jinja2 import Environment, FileSystemLoader
+    from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
     JINJA2_AVAILABLE = True
 except ImportError:
     JINJA2_AVAILABLE = False
@@ -37,6 +38,21 @@ logger = logging.getLogger(__name__)
 TEMPLATE_DIR = Path(__file__).parent / "templates"
 
 
+@lru_cache(maxsize=1)
+def get_template_environment() -> "Environment":
+    """Shared Jinja2 environment; compiled templates are reused across reports."""
+    # Templates ship with the code, so skip the per-render mtime check.
+    # The bytecode cache (in the system temp dir) lets new worker processes
+    # load compiled templates instead of re-parsing them.
+    return Environment(
+        loader=FileSystemLoader(TEMPLATE_DIR),
+        autoescape=True,
+        auto_reload=False,
+        cache_size=50,
+        bytecode_cache=FileSystemBytecodeCache()
+    )
+
+
 class ReportGenerator:
     """PDF report generator using WeasyPrint and Jinja2."""
 
@@ -48,10 +64,7 @@ class ReportGenerator:
             )
 
         # Setup Jinja2 environment
-        self.jinja_env = Environment(
-            loader=FileSystemLoader(TEMPLATE_DIR),
-            autoescape=True
-        )
+        self.jinja_env = get_template_environment()
 
         # Font configuration for better PDF rendering
         self.font_config = FontConfiguration()
@@ -144,7 +157,10 @@ class ReportGenerator:
         # Run WeasyPrint in a thread to avoid blocking
         def _generate_pdf():
             html_doc = HTML(string=html_content)
-            return html_doc.write_pdf(font_config=self.font_config)
+            # Recompress embedded images to keep long reports small
+            return html_doc.write_pdf(font_config=self.font_config,
+                                      optimize_images=True,
+                                      jpeg_quality=85)
 
         # Execute in thread pool to avoid blocking the event loop
         loop = asyncio.get_event_loop()
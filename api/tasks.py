@@ -12,7 +12,7 @@ from datetime import datetime
 import traceback
 import numpy as np
 
-from cyberrisk_core import calculate_ale, calculate_percentiles, format_currency
+from cyberrisk_core import calculate_ale, calculate_percentiles, format_currency, AliasSampler
 from .database import update_simulation_status, update_simulation_run, update_optimization_run
 
 logger = logging.getLogger(__name__)
@@ -101,19 +101,17 @@ async def run_simulation_task(
         median_triangular = float(np.median(triangular_samples))
 
         # Calculate occurrence statistics
-        occurrence_samples = np.random.choice(
-            occurrence_counts, iterations, p=occurrence_probabilities
-        )
+        occurrence_samples = AliasSampler(
+            occurrence_counts, occurrence_probabilities
+        ).sample(iterations)
         mean_occurrences = float(np.mean(occurrence_samples))
         variance_occurrences = float(np.var(occurrence_samples))
 
         # Calculate percentiles for asset values
         percentiles = [5, 10, 25, 50, 75, 90, 95, 99, 99.9]
-        asset_value_percentiles = {
-            str(p): float(
-                np.percentile(
-                    triangular_samples,
-                    p)) for p in percentiles}
+        asset_value_percentiles = dict(zip(
+            map(str, percentiles),
+            calculate_percentiles(triangular_samples, percentiles).values()))
 
         # Risk assessment based on ALE
         if ale < 100000:
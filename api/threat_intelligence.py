@@ -7,19 +7,49 @@ Phase 4 Implementation
 import asyncio
 import json
 import hashlib
+import heapq
 import aiohttp
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 import logging
+import random
 import re
 from urllib.parse import urlparse
 import xml.etree.ElementTree as ET
+from collections import Counter
+from functools import lru_cache
+from types import MappingProxyType
 from .database import get_db_connection
 
+try:
+    import orjson
+
+    def _json_dumps(value: Any) -> str:
+        return orjson.dumps(value).decode()
+except ImportError:
+    _json_dumps = json.dumps
+
 logger = logging.getLogger(__name__)
 
+# Feed requests fail fast on dead endpoints instead of hanging the refresh
+_FEED_TIMEOUT = aiohttp.ClientTimeout(total=30, sock_connect=5, sock_read=10)
+_FEED_RETRIES = 2
+
+# Shared storage for the small string tuples repeated across threats
+# ("all", "global", "Apply vendor patches", ...). Per-vulnerability values
+# (CISA requiredAction text) are mostly unique, so the table is an LRU:
+# recurring tuples stay shared while one-offs age out across feed refreshes.
+@lru_cache(maxsize=1024)
+def _shared_tuple(key: Tuple[str, ...]) -> Tuple[str, ...]:
+    return key
+
+
+def _intern(values) -> Tuple[str, ...]:
+    """Return a shared tuple equal to values"""
+    return _shared_tuple(tuple(values))
+
 
 class ThreatSeverity(Enum):
     """Threat severity levels"""
@@ -44,6 +74,15 @@ class ThreatCategory(Enum):
     FRAUD = "fraud"
 
 
+_SEVERITY_RANK = {
+    ThreatSeverity.CRITICAL: 4,
+    ThreatSeverity.HIGH: 3,
+    ThreatSeverity.MEDIUM: 2,
+    ThreatSeverity.LOW: 1,
+    ThreatSeverity.INFO: 0
+}
+
+
 @dataclass
 class ThreatIntelligenceItem:
     """Threat intelligence data structure"""
@@ -55,15 +94,26 @@ class ThreatIntelligenceItem:
     confidence: float  # 0.0 to 1.0
     source: str
     indicators: List[Dict[str, str]]  # IOCs, domains, IPs, etc.
-    affected_industries: List[str]
-    affected_regions: List[str]
-    mitigation_advice: List[str]
+    affected_industries: Tuple[str, ...]
+    affected_regions: Tuple[str, ...]
+    mitigation_advice: Tuple[str, ...]
     references: List[str]
     first_seen: datetime
     last_updated: datetime
     expires_at: Optional[datetime]
     is_active: bool
 
+    def __post_init__(self):
+        # Identical lists collapse to one shared tuple
+        self.affected_industries = _intern(self.affected_industries)
+        self.affected_regions = _intern(self.affected_regions)
+        self.mitigation_advice = _intern(self.mitigation_advice)
+
+
+def _threat_priority(threat: ThreatIntelligenceItem) -> Tuple[int, datetime]:
+    """Sort key ranking threats by severity, then recency"""
+    return (_SEVERITY_RANK[threat.severity], threat.last_updated)
+
 
 @dataclass
 class VulnerabilityReport:
@@ -98,6 +148,137 @@ class ThreatAssessment:
     recommended_actions: List[str]
 
 
+# Simulated scan findings; affected_asset is the default used when fewer
+# target assets are supplied than findings
+_FINDINGS_TEMPLATE = (
+    MappingProxyType({
+        'vulnerability_id': 'CVE-2024-0001',
+        'title': 'Remote Code Execution in Web Server',
+        'severity': 'critical',
+        'cvss_score': 9.8,
+        'affected_asset': 'server-01',
+        'description': 'Unauthenticated remote code execution vulnerability',
+        'recommendation': 'Apply security patch immediately'
+    }),
+    MappingProxyType({
+        'vulnerability_id': 'CVE-2024-0002',
+        'title': 'SQL Injection in Application',
+        'severity': 'high',
+        'cvss_score': 8.1,
+        'affected_asset': 'app-server',
+        'description': 'SQL injection vulnerability in user input validation',
+        'recommendation': 'Implement input sanitization and parameterized queries'
+    })
+)
+
+
+class _ReportFlusher:
+    """
+    Batches vulnerability report inserts into a single round trip.
+
+    Delivery is at-most-once: put() returns as soon as a report is queued,
+    write failures are logged rather than raised to the caller, and reports
+    still queued when the process stops without flush() are lost.
+    """
+
+    query = """
+        INSERT INTO vulnerability_reports
+        (scan_id, organization_id, scan_type, target_assets,
+         vulnerabilities_found, critical_count, high_count,
+         medium_count, low_count, scan_started, scan_completed,
+         findings, recommendations)
+        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+    """
+
+    def __init__(self, max_rows: int = 1000, wait_time: float = 0.2):
+        self.max_rows = max_rows
+        self.wait_time = wait_time  # seconds to wait for a batch to fill
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def put(self, report: VulnerabilityReport):
+        """Queue a report, starting the background writer if needed"""
+
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # The queue and writer task belong to one event loop; a new
+            # loop (e.g. a later asyncio.run) gets its own
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = None
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(self._queue))
+
+        await self._queue.put((
+            report.scan_id, report.organization_id, report.scan_type,
+            _json_dumps(report.target_assets), report.vulnerabilities_found,
+            report.critical_count, report.high_count, report.medium_count,
+            report.low_count, report.scan_started, report.scan_completed,
+            _json_dumps(report.findings), _json_dumps(report.recommendations)
+        ))
+
+    async def flush(self):
+        """Wait for queued reports to be written, then stop the writer"""
+
+        if self._loop is not asyncio.get_running_loop():
+            # Nothing was queued on this loop
+            return
+        await self._queue.join()
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self, queue: asyncio.Queue):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.wait_time
+
+            while len(batch) < self.max_rows:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(
+                        await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            try:
+                await self._write(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _write(self, records: List[Tuple]):
+        try:
+            async with get_db_connection() as conn:
+                await conn.executemany(self.query, records)
+            return
+        except Exception as e:
+            logger.error(f"Error storing batch of {len(records)} vulnerability reports: {e}")
+
+        # One bad row fails the whole batch; retry individually so only
+        # the rows that actually fail are lost
+        stored = 0
+        try:
+            async with get_db_connection() as conn:
+                for record in records:
+                    try:
+                        await conn.execute(self.query, *record)
+                        stored += 1
+                    except Exception as e:
+                        logger.error(f"Error storing vulnerability report {record[0]}: {e}")
+        except Exception as e:
+            logger.error(f"Error retrying vulnerability reports: {e}")
+
+        lost = len(records) - stored
+        if lost:
+            logger.error(f"Dropped {lost} of {len(records)} vulnerability reports")
+
+
 class ThreatIntelligenceEngine:
     """Automated threat intelligence engine"""
 
@@ -122,6 +303,8 @@ class ThreatIntelligenceEngine:
         self.threat_cache = {}
         self.cache_ttl = 3600  # 1 hour
 
+        self._report_flusher = _ReportFlusher()
+
     async def collect_threat_intelligence(
             self) -> List[ThreatIntelligenceItem]:
         """Collect threat intelligence from multiple sources"""
@@ -186,6 +369,25 @@ class ThreatIntelligenceEngine:
                 len(sample_threats)} threat intelligence items")
         return sample_threats
 
+    async def _fetch_feed(self, session: aiohttp.ClientSession,
+                          url: str) -> Optional[Dict[str, Any]]:
+        """Fetch a JSON feed, retrying transient network errors with jitter"""
+
+        for attempt in range(_FEED_RETRIES + 1):
+            try:
+                async with session.get(url, timeout=_FEED_TIMEOUT) as response:
+                    if response.status != 200:
+                        return None
+                    return await response.json()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == _FEED_RETRIES:
+                    raise
+                delay = min(0.5 * 2 ** attempt, 4.0) * random.uniform(0.5, 1.5)
+                logger.warning(f"Retrying feed {url} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+        return None
+
     async def _collect_cisa_threats(self) -> List[ThreatIntelligenceItem]:
         """Collect threats from CISA Known Exploited Vulnerabilities"""
 
@@ -193,47 +395,45 @@ class ThreatIntelligenceEngine:
 
         try:
             async with aiohttp.ClientSession() as session:
-                async with session.get(self.threat_feeds['cisa_known_exploited'], timeout=30) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        for vuln in data.get('vulnerabilities', []):
-                            threat = ThreatIntelligenceItem(
-                                threat_id=f"cisa_{
-                                    vuln.get(
-                                        'cveID', 'unknown')}",
-                                title=f"CISA KEV: {
-                                    vuln.get(
-                                        'vulnerabilityName',
-                                        'Unknown Vulnerability')}",
-                                description=vuln.get(
-                                    'shortDescription', 'No description available'),
-                                category=ThreatCategory.VULNERABILITY,
-                                severity=self._map_severity(
-                                    vuln.get('vulnerabilityName', '')),
-                                confidence=0.9,  # CISA has high confidence
-                                source='CISA Known Exploited Vulnerabilities',
-                                indicators=[{
-                                    'type': 'cve',
-                                    'value': vuln.get('cveID', ''),
-                                    'vendor': vuln.get('vendorProject', ''),
-                                    'product': vuln.get('product', '')
-                                }],
-                                affected_industries=['all'],
-                                affected_regions=['global'],
-                                mitigation_advice=[
-                                    vuln.get(
-                                        'requiredAction',
-                                        'Apply vendor patches')],
-                                references=[
-                                    f"https://cve.mitre.org/cgi-bin/cvename.cgi?name={vuln.get('cveID', '')}"],
-                                first_seen=datetime.fromisoformat(
-                                    vuln.get('dateAdded', datetime.utcnow().isoformat())),
-                                last_updated=datetime.utcnow(),
-                                expires_at=None,
-                                is_active=True
-                            )
-                            threats.append(threat)
+                data = await self._fetch_feed(session, self.threat_feeds['cisa_known_exploited'])
+                if data is not None:
+                    for vuln in data.get('vulnerabilities', []):
+                        threat = ThreatIntelligenceItem(
+                            threat_id=f"cisa_{
+                                vuln.get(
+                                    'cveID', 'unknown')}",
+                            title=f"CISA KEV: {
+                                vuln.get(
+                                    'vulnerabilityName',
+                                    'Unknown Vulnerability')}",
+                            description=vuln.get(
+                                'shortDescription', 'No description available'),
+                            category=ThreatCategory.VULNERABILITY,
+                            severity=self._map_severity(
+                                vuln.get('vulnerabilityName', '')),
+                            confidence=0.9,  # CISA has high confidence
+                            source='CISA Known Exploited Vulnerabilities',
+                            indicators=[{
+                                'type': 'cve',
+                                'value': vuln.get('cveID', ''),
+                                'vendor': vuln.get('vendorProject', ''),
+                                'product': vuln.get('product', '')
+                            }],
+                            affected_industries=['all'],
+                            affected_regions=['global'],
+                            mitigation_advice=[
+                                vuln.get(
+                                    'requiredAction',
+                                    'Apply vendor patches')],
+                            references=[
+                                f"https://cve.mitre.org/cgi-bin/cvename.cgi?name={vuln.get('cveID', '')}"],
+                            first_seen=datetime.fromisoformat(
+                                vuln.get('dateAdded', datetime.utcnow().isoformat())),
+                            last_updated=datetime.utcnow(),
+                            expires_at=None,
+                            is_active=True
+                        )
+                        threats.append(threat)
 
         except Exception as e:
             logger.error(f"Error collecting CISA threats: {e}")
@@ -256,45 +456,43 @@ class ThreatIntelligenceEngine:
                 end_date.strftime('%Y-%m-%d')}T23:59:59.999"
 
             async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=30) as response:
-                    if response.status == 200:
-                        data = await response.json()
-
-                        for vuln in data.get('vulnerabilities', []):
-                            cve_data = vuln.get('cve', {})
-                            cve_id = cve_data.get('id', 'unknown')
-
-                            # Extract severity from CVSS
-                            severity = ThreatSeverity.MEDIUM
-                            cvss_data = cve_data.get('metrics', {})
-                            if 'cvssMetricV31' in cvss_data:
-                                cvss_score = cvss_data['cvssMetricV31'][0].get(
-                                    'cvssData', {}).get('baseScore', 5.0)
-                                severity = self._cvss_to_severity(cvss_score)
-
-                            threat = ThreatIntelligenceItem(
-                                threat_id=f"nvd_{cve_id}",
-                                title=f"NVD CVE: {cve_id}",
-                                description=cve_data.get('descriptions', [{}])[0].get('value', 'No description available'),
-                                category=ThreatCategory.VULNERABILITY,
-                                severity=severity,
-                                confidence=0.8,
-                                source='National Vulnerability Database',
-                                indicators=[{
-                                    'type': 'cve',
-                                    'value': cve_id,
-                                    'cvss_score': str(cvss_score) if 'cvss_score' in locals() else 'unknown'
-                                }],
-                                affected_industries=['all'],
-                                affected_regions=['global'],
-                                mitigation_advice=['Apply vendor patches when available', 'Monitor for exploits'],
-                                references=[f"https://nvd.nist.gov/vuln/detail/{cve_id}"],
-                                first_seen=datetime.fromisoformat(cve_data.get('published', datetime.utcnow().isoformat())),
-                                last_updated=datetime.utcnow(),
-                                expires_at=None,
-                                is_active=True
-                            )
-                            threats.append(threat)
+                data = await self._fetch_feed(session, url)
+                if data is not None:
+                    for vuln in data.get('vulnerabilities', []):
+                        cve_data = vuln.get('cve', {})
+                        cve_id = cve_data.get('id', 'unknown')
+
+                        # Extract severity from CVSS
+                        severity = ThreatSeverity.MEDIUM
+                        cvss_data = cve_data.get('metrics', {})
+                        if 'cvssMetricV31' in cvss_data:
+                            cvss_score = cvss_data['cvssMetricV31'][0].get(
+                                'cvssData', {}).get('baseScore', 5.0)
+                            severity = self._cvss_to_severity(cvss_score)
+
+                        threat = ThreatIntelligenceItem(
+                            threat_id=f"nvd_{cve_id}",
+                            title=f"NVD CVE: {cve_id}",
+                            description=cve_data.get('descriptions', [{}])[0].get('value', 'No description available'),
+                            category=ThreatCategory.VULNERABILITY,
+                            severity=severity,
+                            confidence=0.8,
+                            source='National Vulnerability Database',
+                            indicators=[{
+                                'type': 'cve',
+                                'value': cve_id,
+                                'cvss_score': str(cvss_score) if 'cvss_score' in locals() else 'unknown'
+                            }],
+                            affected_industries=['all'],
+                            affected_regions=['global'],
+                            mitigation_advice=['Apply vendor patches when available', 'Monitor for exploits'],
+                            references=[f"https://nvd.nist.gov/vuln/detail/{cve_id}"],
+                            first_seen=datetime.fromisoformat(cve_data.get('published', datetime.utcnow().isoformat())),
+                            last_updated=datetime.utcnow(),
+                            expires_at=None,
+                            is_active=True
+                        )
+                        threats.append(threat)
 
         except Exception as e:
             logger.error(f"Error collecting NVD threats: {e}")
@@ -416,11 +614,11 @@ class ThreatIntelligenceEngine:
                         query,
                         threat.threat_id, threat.title, threat.description,
                         threat.category.value, threat.severity.value, threat.confidence,
-                        threat.source, json.dumps(threat.indicators),
-                        json.dumps(threat.affected_industries),
-                        json.dumps(threat.affected_regions),
-                        json.dumps(threat.mitigation_advice),
-                        json.dumps(threat.references),
+                        threat.source, _json_dumps(threat.indicators),
+                        _json_dumps(threat.affected_industries),
+                        _json_dumps(threat.affected_regions),
+                        _json_dumps(threat.mitigation_advice),
+                        _json_dumps(threat.references),
                         threat.first_seen, threat.last_updated,
                         threat.expires_at, threat.is_active
                     )
@@ -436,16 +634,17 @@ class ThreatIntelligenceEngine:
             # Get organization profile
             org_profile = await self._get_organization_profile(organization_id)
 
-            # Get relevant threats
-            industry_threats = await self._get_threats_by_industry(org_profile.get('industry', 'technology'))
-            geographic_threats = await self._get_threats_by_region(org_profile.get('region', 'global'))
-            technology_threats = await self._get_threats_by_technology(org_profile.get('technology_stack', []))
+            # Get relevant threats (independent queries, run concurrently)
+            industry_threats, geographic_threats, technology_threats = await asyncio.gather(
+                self._get_threats_by_industry(org_profile.get('industry', 'technology')),
+                self._get_threats_by_region(org_profile.get('region', 'global')),
+                self._get_threats_by_technology(org_profile.get('technology_stack', [])))
 
             # Calculate threat levels
             all_relevant_threats = industry_threats + \
                 geographic_threats + technology_threats
-            critical_threats = len(
-                [t for t in all_relevant_threats if t.severity == ThreatSeverity.CRITICAL])
+            critical_threats = sum(
+                1 for t in all_relevant_threats if t.severity == ThreatSeverity.CRITICAL)
 
             # Determine overall threat level
             if critical_threats > 5:
@@ -476,9 +675,12 @@ class ThreatIntelligenceEngine:
                 overall_threat_level=overall_level,
                 active_threats=len(all_relevant_threats),
                 critical_threats=critical_threats,
-                industry_specific_threats=industry_threats[:10],
-                geographic_threats=geographic_threats[:5],
-                technology_threats=technology_threats[:5],
+                industry_specific_threats=heapq.nlargest(
+                    10, industry_threats, key=_threat_priority),
+                geographic_threats=heapq.nlargest(
+                    5, geographic_threats, key=_threat_priority),
+                technology_threats=heapq.nlargest(
+                    5, technology_threats, key=_threat_priority),
                 risk_score_impact=risk_impact,
                 recommended_actions=recommendations
             )
@@ -662,7 +864,7 @@ class ThreatIntelligenceEngine:
         recommendations = []
 
         # Analyze threat categories
-        threat_categories = [t.category for t in threats]
+        threat_categories = {t.category for t in threats}
 
         if ThreatCategory.RANSOMWARE in threat_categories:
             recommendations.extend([
@@ -709,36 +911,26 @@ class ThreatIntelligenceEngine:
             target_assets: List[str]) -> VulnerabilityReport:
         """Perform vulnerability scan on organization assets"""
 
-        scan_id = f"scan_{organization_id}_{
-            int(
-                datetime.utcnow().timestamp())}"
         scan_started = datetime.utcnow()
+        scan_id = f"scan_{organization_id}_{int(scan_started.timestamp())}"
 
         # Simulated vulnerability scan results
         # In production, this would integrate with actual vulnerability
         # scanners
 
-        findings = [{'vulnerability_id': 'CVE-2024-0001',
-                     'title': 'Remote Code Execution in Web Server',
-                     'severity': 'critical',
-                     'cvss_score': 9.8,
-                     'affected_asset': target_assets[0] if target_assets else 'server-01',
-                     'description': 'Unauthenticated remote code execution vulnerability',
-                     'recommendation': 'Apply security patch immediately'},
-                    {'vulnerability_id': 'CVE-2024-0002',
-                     'title': 'SQL Injection in Application',
-                     'severity': 'high',
-                     'cvss_score': 8.1,
-                     'affected_asset': target_assets[1] if len(target_assets) > 1 else 'app-server',
-                     'description': 'SQL injection vulnerability in user input validation',
-                     'recommendation': 'Implement input sanitization and parameterized queries'}]
+        findings = [
+            dict(template,
+                 affected_asset=target_assets[i] if i < len(target_assets)
+                 else template['affected_asset'])
+            for i, template in enumerate(_FINDINGS_TEMPLATE)
+        ]
 
         # Count vulnerabilities by severity
-        critical_count = len(
-            [f for f in findings if f['severity'] == 'critical'])
-        high_count = len([f for f in findings if f['severity'] == 'high'])
-        medium_count = len([f for f in findings if f['severity'] == 'medium'])
-        low_count = len([f for f in findings if f['severity'] == 'low'])
+        severity_counts = Counter(f['severity'] for f in findings)
+        critical_count = severity_counts['critical']
+        high_count = severity_counts['high']
+        medium_count = severity_counts['medium']
+        low_count = severity_counts['low']
 
         recommendations = [
             "Prioritize patching critical and high severity vulnerabilities",
@@ -770,31 +962,35 @@ class ThreatIntelligenceEngine:
 
         return report
 
+    async def scan_many(self,
+                        targets: Dict[int, List[str]],
+                        max_concurrency: int = 32) -> List[VulnerabilityReport]:
+        """Scan several organizations concurrently, keyed by organization ID"""
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def _scan(organization_id: int, target_assets: List[str]):
+            async with semaphore:
+                return await self.perform_vulnerability_scan(
+                    organization_id, target_assets)
+
+        return await asyncio.gather(
+            *(_scan(org_id, assets) for org_id, assets in targets.items()))
+
     async def _store_vulnerability_report(self, report: VulnerabilityReport):
-        """Store vulnerability scan report in database"""
+        """
+        Queue vulnerability scan report for a batched database write.
 
-        try:
-            async with get_db_connection() as conn:
-                query = """
-                    INSERT INTO vulnerability_reports
-                    (scan_id, organization_id, scan_type, target_assets,
-                     vulnerabilities_found, critical_count, high_count,
-                     medium_count, low_count, scan_started, scan_completed,
-                     findings, recommendations)
-                    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
-                """
+        At-most-once: a failed write is logged, not raised here, and the
+        report is lost if the process exits before flush_vulnerability_reports.
+        """
 
-                await conn.execute(
-                    query,
-                    report.scan_id, report.organization_id, report.scan_type,
-                    json.dumps(report.target_assets), report.vulnerabilities_found,
-                    report.critical_count, report.high_count, report.medium_count,
-                    report.low_count, report.scan_started, report.scan_completed,
-                    json.dumps(report.findings), json.dumps(report.recommendations)
-                )
+        await self._report_flusher.put(report)
 
-        except Exception as e:
-            logger.error(f"Error storing vulnerability report: {e}")
+    async def flush_vulnerability_reports(self):
+        """Write any queued vulnerability reports to the database"""
+
+        await self._report_flusher.flush()
 
 
 # Global threat intelligence engine instance
@@ -8,6 +8,7 @@ designed for NIS2 and CSRD compliance reporting.
 from .risk_metrics import Task1 as calculate_ale, calculate_percentiles, format_currency
 from .prob_model import Task2 as calculate_conditional_probabilities  
 from .control_optimizer import Task3 as optimize_controls
+from .alias import AliasSampler
 
 # Version info
 __version__ = "1.0.0"
@@ -19,5 +20,6 @@ __all__ = [
     "calculate_conditional_probabilities", 
     "optimize_controls",
     "calculate_percentiles",
-    "format_currency"
+    "format_currency",
+    "AliasSampler"
 ] 
\ No newline at end of file
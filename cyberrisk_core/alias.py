@@ -0,0 +1,68 @@
+"""
+Alias Sampling Module - Constant-time draws from discrete distributions
+
+This module provides Vose's alias method for sampling annual occurrence
+counts (or any finite discrete distribution):
+- O(k) table construction from k outcome probabilities
+- O(1) work per draw, independent of k
+"""
+
+from typing import Optional, Sequence, Union
+import numpy as np
+
+
+class AliasSampler:
+    """Vose alias table over a fixed set of discrete outcomes."""
+
+    def __init__(self, values: Sequence[float], probabilities: Sequence[float]):
+        """
+        Build the alias table.
+
+        Args:
+            values: Outcome values [N0, N1, ..., Nk-1]
+            probabilities: Probabilities [P0, P1, ..., Pk-1]; normalized if
+                they do not sum exactly to 1
+        """
+        self.values = np.asarray(values)
+        probs = np.asarray(probabilities, dtype=np.float64)
+
+        if probs.ndim != 1 or probs.size == 0 or probs.size != self.values.size:
+            raise ValueError("values and probabilities must be non-empty and equal length")
+        if np.any(probs < 0) or probs.sum() <= 0:
+            raise ValueError("probabilities must be non-negative with a positive sum")
+
+        k = probs.size
+        scaled = probs * (k / probs.sum())
+        self.prob = np.ones(k)
+        self.alias = np.arange(k)
+
+        small = [i for i in range(k) if scaled[i] < 1.0]
+        large = [i for i in range(k) if scaled[i] >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            # The large column donates (1 - scaled[s]) to fill column s
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # Whatever remains is 1 up to rounding error, so keeps prob = 1
+
+    def sample(self, num: int,
+               rng: Optional[Union[int, np.random.Generator]] = None) -> np.ndarray:
+        """
+        Draw num outcomes.
+
+        Args:
+            num: Number of draws
+            rng: Optional seed or np.random.Generator
+
+        Returns:
+            Array of num values drawn from the distribution
+        """
+        rng = np.random.default_rng(rng)
+        i = rng.integers(0, self.prob.size, num)
+        u = rng.random(num)
+        return np.where(u < self.prob[i], self.values[i], self.values[self.alias[i]])
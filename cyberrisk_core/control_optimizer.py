@@ -11,6 +11,7 @@ import numpy as np
 from typing import List, Tuple, Dict, Optional
 try:
     from scipy.optimize import linprog
+    from scipy.linalg import cho_factor, cho_solve
     SCIPY_AVAILABLE = True
 except ImportError:
     SCIPY_AVAILABLE = False
@@ -18,12 +19,13 @@ except ImportError:
 
 def Task3(x: List[List[float]], y: List[float], z: List[float], 
          x_initial: List[int], c: List[float], x_bound: List[int], 
-         se_bound: float, ml_bound: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+         se_bound: float, ml_bound: float,
+         method: str = 'highs') -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
     Optimize security control deployment using linear programming.
     
     Args:
-        x: Historical control count matrix (4 lists of 9 values each)
+        x: Historical control counts, array-like of shape (4, 9) (controls x observations)
         y: Safeguard effect values (9 values) 
         z: Maintenance load values (9 values)
         x_initial: Current control deployment [c1, c2, c3, c4]
@@ -31,6 +33,8 @@ def Task3(x: List[List[float]], y: List[float], z: List[float],
         x_bound: Upper bounds for each control type [max1, max2, max3, max4]
         se_bound: Minimum safeguard effect requirement
         ml_bound: Maximum maintenance load allowed
+        method: linprog method; 'highs' lets HiGHS pick simplex or IPM,
+            'highs-ds' / 'highs-ipm' pin one for like-for-like timing
         
     Returns:
         Tuple containing (weights_b, weights_d, x_add) where:
@@ -44,37 +48,53 @@ def Task3(x: List[List[float]], y: List[float], z: List[float],
         )
     
     # Convert inputs to numpy arrays
-    X_features = np.array(x).T  # Transpose to get (9 x 4) design matrix
+    X_features = np.asarray(x, dtype=np.float64).T  # (9 x 4) view, no copy for float arrays
     n = X_features.shape[0]     # number of samples = 9
     ones = np.ones((n, 1))
     X_design = np.hstack((ones, X_features))  # Design matrix with intercept (9 x 5)
     
-    y = np.array(y)
-    z = np.array(z)
+    # No-op for float64 arrays, so callers passing arrays skip the copy
+    y = np.asarray(y, dtype=np.float64)
+    z = np.asarray(z, dtype=np.float64)
     
     # Compute least squares estimates using normal equations
     # weights = (X^T X)^(-1) X^T y
+    # Both targets share the design matrix, so factor X^T X once
     try:
-        weights_b, _, _, _ = np.linalg.lstsq(X_design, y, rcond=None)
-        weights_d, _, _, _ = np.linalg.lstsq(X_design, z, rcond=None)
-    except np.linalg.LinAlgError as e:
-        raise ValueError(f"Failed to solve linear regression: {e}")
+        xtx_factor = cho_factor(X_design.T @ X_design)
+        weights_b = cho_solve(xtx_factor, X_design.T @ y)
+        weights_d = cho_solve(xtx_factor, X_design.T @ z)
+    except np.linalg.LinAlgError:
+        # Rank-deficient design: fall back to SVD-based least squares
+        try:
+            weights_b, _, _, _ = np.linalg.lstsq(X_design, y, rcond=None)
+            weights_d, _, _, _ = np.linalg.lstsq(X_design, z, rcond=None)
+        except np.linalg.LinAlgError as e:
+            raise ValueError(f"Failed to solve linear regression: {e}")
+    
+    # Split intercepts from per-control coefficients once
+    wb_intercept, wb_coefs = weights_b[0], weights_b[1:]
+    wd_intercept, wd_coefs = weights_d[0], weights_d[1:]
     
     # Calculate current performance metrics
-    current_safeguard = weights_b[0] + np.dot(weights_b[1:], x_initial)
-    current_maintenance = weights_d[0] + np.dot(weights_d[1:], x_initial)
+    current_safeguard = wb_intercept + np.dot(wb_coefs, x_initial)
+    current_maintenance = wd_intercept + np.dot(wd_coefs, x_initial)
     
     # Calculate gaps that additional controls must address
     safeguard_gap = se_bound - current_safeguard
     maintenance_gap = ml_bound - current_maintenance
     
+    # Current deployment already meets both targets: with non-negative costs
+    # the cheapest addition is nothing, so skip the solver
+    if safeguard_gap <= 0 and maintenance_gap >= 0 and min(c) >= 0:
+        return (weights_b, weights_d, np.zeros(len(c)))
+    
     # Setup linear programming constraints
     # Constraint 1: weights_b[1:] * x_add >= safeguard_gap
     # Constraint 2: weights_d[1:] * x_add <= maintenance_gap
-    A_ub = np.array([
-        -weights_b[1:],   # Safeguard constraint (multiply by -1 for >=)
-         weights_d[1:]    # Maintenance constraint 
-    ])
+    A_ub = np.empty((2, wb_coefs.size))
+    np.negative(wb_coefs, out=A_ub[0])  # Safeguard constraint (multiply by -1 for >=)
+    A_ub[1] = wd_coefs                  # Maintenance constraint
     b_ub = np.array([
         -safeguard_gap,   # Negative because we multiplied constraint by -1
          maintenance_gap
@@ -89,8 +109,10 @@ def Task3(x: List[List[float]], y: List[float], z: List[float],
     # Solve the linear programming problem
     # Objective: minimize total cost c^T * x_add
     try:
+        # Presolve costs more than the solve itself on a 2x4 LP
         result = linprog(c, A_ub=A_ub, b_ub=b_ub, bounds=bounds, 
-                        method='highs', options={'disp': False})
+                        method=method,
+                        options={'presolve': False, 'disp': False})
         
         if not result.success:
             raise ValueError(f"Optimization failed: {result.message}")
@@ -116,14 +138,36 @@ def evaluate_control_portfolio(x_current: List[int], weights_b: np.ndarray,
     Returns:
         Dictionary with safeguard effect and maintenance load
     """
-    x_current = np.array(x_current)
+    batch = evaluate_control_portfolio_batch(
+        np.asarray(x_current)[np.newaxis, :], weights_b, weights_d
+    )
     
-    safeguard_effect = weights_b[0] + np.dot(weights_b[1:], x_current)
-    maintenance_load = weights_d[0] + np.dot(weights_d[1:], x_current)
+    return {
+        'safeguard_effect': float(batch['safeguard_effect'][0]),
+        'maintenance_load': float(batch['maintenance_load'][0])
+    }
+
+
+def evaluate_control_portfolio_batch(x_candidates: np.ndarray, weights_b: np.ndarray,
+                                     weights_d: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Evaluate many candidate control portfolios at once.
+    
+    Args:
+        x_candidates: Candidate deployments, shape (n_portfolios, n_controls)
+        weights_b: Regression weights for safeguard effect
+        weights_d: Regression weights for maintenance load
+        
+    Returns:
+        Dictionary with per-portfolio safeguard effect and maintenance load arrays
+    """
+    x_candidates = np.asarray(x_candidates, dtype=np.float64)
+    weights_b = np.asarray(weights_b)
+    weights_d = np.asarray(weights_d)
     
     return {
-        'safeguard_effect': float(safeguard_effect),
-        'maintenance_load': float(maintenance_load)
+        'safeguard_effect': weights_b[0] + x_candidates @ weights_b[1:],
+        'maintenance_load': weights_d[0] + x_candidates @ weights_d[1:]
     }
 
 
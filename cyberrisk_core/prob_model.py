@@ -9,6 +9,15 @@ two-phase security screening processes, including:
 """
 
 from typing import List, Tuple
+import numpy as np
+
+
+# Cells of the 3x4 table (rows Y=6..8, columns X=2..5) where X + Y <= 10
+_SUM_AT_MOST_10 = np.array([
+    [True, True, True, False],   # Y=6: X=2,3,4
+    [True, True, False, False],  # Y=7: X=2,3
+    [True, False, False, False]  # Y=8: X=2
+])
 
 
 def Task2(num: int, table: List[List[int]], probs: List[float]) -> Tuple[float, float, float]:
@@ -27,51 +36,38 @@ def Task2(num: int, table: List[List[int]], probs: List[float]) -> Tuple[float,
         - prob2: P(X + Y ≤ 10)  
         - prob3: P(Y=8 | T) using Bayes theorem
     """
-    # Unpack the joint distribution table
-    a, b, c, d = table[0]  # Y=6 row
-    e, f, g, h = table[1]  # Y=7 row  
-    i, j, k, l = table[2]  # Y=8 row
-    
+    # Float so weighted or normalized (non-integer) tables sum exactly as
+    # given; integer counts are represented exactly either way
+    joint = np.asarray(table, dtype=np.float64)
+
     # Total number of cases (should equal num)
-    total = a + b + c + d + e + f + g + h + i + j + k + l
-    
-    # Marginal sums by X (columns)
-    X2 = a + e + i  # X = 2
-    X3 = b + f + j  # X = 3
-    X4 = c + g + k  # X = 4
-    X5 = d + h + l  # X = 5
-    
-    # Marginal sums by Y (rows)
-    Y6 = a + b + c + d  # Y = 6
-    Y7 = e + f + g + h  # Y = 7
-    Y8 = i + j + k + l  # Y = 8
-    
+    total = float(joint.sum())
+
+    # Marginal sums by X (columns X=2..5) and by Y (rows Y=6..8)
+    col_sums = joint.sum(axis=0)
+    Y6, Y7, Y8 = (float(y) for y in joint.sum(axis=1))
+
     # (1) prob1: P(3 ≤ X ≤ 4)
-    prob1 = (X3 + X4) / total
-    
+    prob1 = float(col_sums[1] + col_sums[2]) / total
+
     # (2) prob2: P(X + Y ≤ 10)
-    # Qualifying cells where X + Y ≤ 10:
-    # (X=2,Y=6): a, (X=2,Y=7): e, (X=2,Y=8): i  
-    # (X=3,Y=6): b, (X=3,Y=7): f
-    # (X=4,Y=6): c
-    prob2 = (a + e + i + b + f + c) / total
-    
+    prob2 = float(joint[_SUM_AT_MOST_10].sum()) / total
+
     # (3) Compute P(Y=8 | T) using Bayes theorem
     # Unpack the conditional test probabilities
-    PX2, PX3, PX4, PX5, PY6, PY7 = probs
-    
-    # P(T) computed from the X-side using law of total probability
-    PT_X = (PX2 * X2 + PX3 * X3 + PX4 * X4 + PX5 * X5) / total
-    
+    if len(probs) != 6:
+        raise ValueError(f"probs must hold 6 conditional probabilities, got {len(probs)}")
+    PY6, PY7 = probs[4], probs[5]
+
+    # P(T) * total, computed from the X-side using law of total probability
+    PT_X_num = float(np.dot(probs[:4], col_sums))
+
     # P(T) computed from the Y-side:
-    # Let P(T|Y=8) be unknown. Then by law of total probability:
     # P(T) = P(T|Y=6)*P(Y=6) + P(T|Y=7)*P(Y=7) + P(T|Y=8)*P(Y=8)
-    # Solve for P(T|Y=8):
-    PT_given_Y8 = (PT_X - (PY6 * Y6 + PY7 * Y7) / total) / (Y8 / total)
-    
-    # Now, by Bayes' theorem:
-    # P(Y=8|T) = [P(T|Y=8) * P(Y=8)] / P(T)
-    prob3 = (PT_given_Y8 * (Y8 / total)) / PT_X
+    # so P(T|Y=8)*P(Y=8) * total = PT_X_num - PY6*Y6 - PY7*Y7.
+    # By Bayes' theorem P(Y=8|T) = P(T|Y=8)*P(Y=8) / P(T); the /total
+    # factors cancel, leaving a single division.
+    prob3 = (PT_X_num - PY6 * Y6 - PY7 * Y7) / PT_X_num
 
     return (prob1, prob2, prob3)
 
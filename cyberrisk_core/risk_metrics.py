@@ -8,17 +8,96 @@ This module provides functions for calculating cyber risk metrics using:
 - Monte Carlo simulation for loss expectancy calculations
 """
 
-from math import sqrt, exp, log
-from random import random, gauss, seed
-from typing import List, Tuple, Optional
+from math import sqrt
+from typing import List, Tuple, Optional, Union
+import multiprocessing as mp
 import numpy as np
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Sample count above which the fused Numba kernel replaces the NumPy path
+NUMBA_MIN_SAMPLES = 1_000_000
+
+# Below this, worker process startup costs more than it saves
+PARALLEL_MIN_SAMPLES = 100_000
+
+
+if NUMBA_AVAILABLE:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _mc_kernel(num, mu, sigma, xm, alpha, point2, point3, point4):
+        """
+        Fused Monte Carlo kernel returning (prob2, prob3).
+
+        Streams lognormal + Pareto samples and accumulates both tail counts
+        without materializing the impact arrays. Each thread draws from its
+        own Numba RNG stream, so results are not seedable.
+        """
+        inv_alpha = 1.0 / alpha
+        count_greater_point2 = 0
+        count_between = 0
+        for _ in prange(num):
+            total = (np.exp(np.random.normal(mu, sigma))
+                     + xm / (1.0 - np.random.random()) ** inv_alpha)
+            if total > point2:
+                count_greater_point2 += 1
+            if point3 <= total <= point4:
+                count_between += 1
+        return count_greater_point2 / num, count_between / num
+
+
+def _mc_counts(rng: np.random.Generator, num: int, mu: float, sigma: float,
+               xm: float, alpha: float, point2: float, point3: float,
+               point4: float) -> Tuple[int, int]:
+    """Draw num total impacts and return the two tail counts."""
+    impact_a = rng.lognormal(mu, sigma, num)
+    # Generator.pareto draws Lomax (Pareto II); shifting by 1 gives Pareto(xm, alpha)
+    impact_b = xm * (rng.pareto(alpha, num) + 1.0)
+    total_impacts = impact_a + impact_b
+
+    count_greater_point2 = int(np.count_nonzero(total_impacts > point2))
+    count_between = int(np.count_nonzero(
+        (total_impacts >= point3) & (total_impacts <= point4)))
+    return count_greater_point2, count_between
+
+
+def _triangular_cdf(x: float, a: float, b: float, c: float) -> float:
+    """
+    Returns the CDF of a Triangular(a, c, b) distribution at x.
+    
+    Args:
+        x: Value to evaluate CDF at
+        a: Lower bound
+        b: Upper bound  
+        c: Mode
+        
+    Returns:
+        CDF value at x
+    """
+    if x <= a:
+        return 0.0
+    elif a <= x <= c:
+        return ((x - a)**2) / ((b - a) * (c - a))
+    elif c < x <= b:
+        return 1.0 - ((b - x)**2) / ((b - a) * (b - c))
+    else:  # x > b
+        return 1.0
+
+
+def _mc_worker(args: tuple) -> Tuple[int, int, int]:
+    """Pool entry point: (rng, num, *params) -> (count2, count3, num)."""
+    rng, num = args[0], args[1]
+    return (*_mc_counts(rng, num, *args[2:]), num)
 
 
 def Task1(a: float, b: float, c: float, point1: float, 
          number_set: List[int], prob_set: List[float], 
          num: int, point2: float, mu: float, sigma: float, 
          xm: float, alpha: float, point3: float, point4: float,
-         random_seed: Optional[int] = None) -> Tuple[float, ...]:
+         random_seed: Optional[Union[int, np.random.Generator]] = None,
+         workers: int = 1) -> Tuple[float, ...]:
     """
     Calculate Annualized Loss Expectancy (ALE) using Monte Carlo simulation.
     
@@ -32,44 +111,25 @@ def Task1(a: float, b: float, c: float, point1: float,
         mu, sigma: Log-normal distribution parameters for flaw A
         xm, alpha: Pareto distribution parameters for flaw B  
         point3, point4: Range for P(point3 <= total_impact <= point4)
-        random_seed: Optional seed for reproducible results
+        random_seed: Optional seed or ``np.random.Generator`` for reproducible
+            results. Parallel workers should each receive one of the
+            independent child streams from ``np.random.default_rng(seed).spawn(n)``
+            rather than sharing a seed.
+        workers: Number of processes to split the simulation across. Runs
+            smaller than PARALLEL_MIN_SAMPLES always stay in-process.
         
     Returns:
         Tuple containing (prob1, mean_t, median_t, mean_d, var_d, prob2, prob3, ale)
     """
     
-    if random_seed is not None:
-        seed(random_seed)
-        np.random.seed(random_seed)
+    rng = np.random.default_rng(random_seed)
 
     # --------------------------------------------------
     # (1) Triangular Distribution Calculations
     # --------------------------------------------------
 
-    def triangular_cdf(x: float, a: float, b: float, c: float) -> float:
-        """
-        Returns the CDF of a Triangular(a, c, b) distribution at x.
-        
-        Args:
-            x: Value to evaluate CDF at
-            a: Lower bound
-            b: Upper bound  
-            c: Mode
-            
-        Returns:
-            CDF value at x
-        """
-        if x <= a:
-            return 0.0
-        elif a <= x <= c:
-            return ((x - a)**2) / ((b - a) * (c - a))
-        elif c < x <= b:
-            return 1.0 - ((b - x)**2) / ((b - a) * (b - c))
-        else:  # x > b
-            return 1.0
-
     # 1(i) Compute prob1 = Probability(AV <= point1)
-    prob1 = triangular_cdf(point1, a, b, c)
+    prob1 = _triangular_cdf(point1, a, b, c)
 
     # 1(ii) Mean and Median of the Triangular distribution
     # Mean of Triangular(a, c, b) is (a + b + c) / 3
@@ -95,12 +155,11 @@ def Task1(a: float, b: float, c: float, point1: float,
     # MEAN_d = sum(Ni * Pi), i=0..9
     # VARIANCE_d = E[X^2] - (E[X])^2
 
-    MEAN_d = 0.0
-    E_X2 = 0.0  # For variance calculation
+    N = np.asarray(number_set, dtype=np.float64)
+    P = np.asarray(prob_set, dtype=np.float64)
 
-    for (N_i, P_i) in zip(number_set, prob_set):
-        MEAN_d += N_i * P_i
-        E_X2 += (N_i**2) * P_i
+    MEAN_d = float(np.dot(N, P))
+    E_X2 = float(np.dot(N * N, P))  # For variance calculation
 
     VARIANCE_d = E_X2 - (MEAN_d**2)
 
@@ -108,29 +167,34 @@ def Task1(a: float, b: float, c: float, point1: float,
     # (3) Monte Carlo Simulation
     # --------------------------------------------------
     # We generate 'num' samples of:
-    #   impact_A ~ Lognormal(mu, sigma)  => A = exp( gauss(mu, sigma) )
-    #   impact_B ~ Pareto(xm, alpha)     => B = xm / ( (1 - U)^(1/alpha) ), U in (0,1)
+    #   impact_A ~ Lognormal(mu, sigma)  => A = exp( Normal(mu, sigma) )
+    #   impact_B ~ Pareto(xm, alpha)     => B = xm / ( (1 - U)^(1/alpha) ), U in [0,1)
     # Then total_impact = A + B.
 
-    total_impacts = []
-    for _ in range(num):
-        # Generate flaw A impact (lognormal)
-        # ln(A) ~ Normal(mu, sigma^2)
-        A = exp(gauss(mu, sigma))
-
-        # Generate flaw B impact (Pareto)
-        U = random()
-        B = xm / ((1 - U)**(1.0 / alpha))
-
-        total_impacts.append(A + B)
+    if NUMBA_AVAILABLE and random_seed is None and num >= NUMBA_MIN_SAMPLES:
+        # 3(ii)/(iii) in a single fused pass
+        prob2, prob3 = _mc_kernel(num, mu, sigma, xm, alpha,
+                                  point2, point3, point4)
+    else:
+        params = (mu, sigma, xm, alpha, point2, point3, point4)
+        if workers > 1 and num >= PARALLEL_MIN_SAMPLES:
+            # Independent child streams keep seeded runs reproducible
+            chunk = num // workers
+            sizes = [chunk + num % workers] + [chunk] * (workers - 1)
+            jobs = [(child, size, *params)
+                    for child, size in zip(rng.spawn(workers), sizes)]
+            with mp.Pool(workers) as pool:
+                counts = pool.map(_mc_worker, jobs)
+            count_greater_point2 = sum(c2 for c2, _, _ in counts)
+            count_between = sum(c3 for _, c3, _ in counts)
+        else:
+            count_greater_point2, count_between = _mc_counts(rng, num, *params)
 
-    # 3(ii) prob2 = Probability(total_impact > point2)
-    count_greater_point2 = sum(1 for val in total_impacts if val > point2)
-    prob2 = count_greater_point2 / float(num)
+        # 3(ii) prob2 = Probability(total_impact > point2)
+        prob2 = count_greater_point2 / num
 
-    # 3(iii) prob3 = Probability(point3 <= total_impact <= point4)
-    count_between = sum(1 for val in total_impacts if point3 <= val <= point4)
-    prob3 = count_between / float(num)
+        # 3(iii) prob3 = Probability(point3 <= total_impact <= point4)
+        prob3 = count_between / num
 
     # --------------------------------------------------
     # (4) Calculate ALE
@@ -144,13 +208,15 @@ def Task1(a: float, b: float, c: float, point1: float,
     return (prob1, MEAN_t, MEDIAN_t, MEAN_d, VARIANCE_d, prob2, prob3, ALE)
 
 
-def calculate_percentiles(values: List[float], percentiles: List[float] = None) -> dict:
+def calculate_percentiles(values: List[float], percentiles: List[float] = None,
+                          presorted: bool = False) -> dict:
     """
     Calculate percentiles from simulation results.
     
     Args:
         values: List of simulated values
         percentiles: List of percentile values to calculate (default: [50, 90, 95, 99])
+        presorted: Set when values are already in ascending order to skip the sort
         
     Returns:
         Dictionary mapping percentile to value
@@ -158,13 +224,18 @@ def calculate_percentiles(values: List[float], percentiles: List[float] = None)
     if percentiles is None:
         percentiles = [50, 90, 95, 99]
     
-    values_array = np.array(values)
-    result = {}
+    values_array = np.asarray(values, dtype=np.float64)
+    if not presorted:
+        values_array = np.sort(values_array)
     
-    for p in percentiles:
-        result[f"P{p}"] = float(np.percentile(values_array, p))
+    # Linear interpolation between order statistics, as np.percentile does
+    positions = np.asarray(percentiles, dtype=np.float64) / 100 * (values_array.size - 1)
+    lower = np.floor(positions).astype(np.int64)
+    upper = np.minimum(lower + 1, values_array.size - 1)
+    fraction = positions - lower
+    quantiles = values_array[lower] + (values_array[upper] - values_array[lower]) * fraction
     
-    return result
+    return {f"P{p}": float(q) for p, q in zip(percentiles, quantiles)}
 
 
 def format_currency(amount: float, currency: str = "GBP") -> str:
@@ -179,12 +179,12 @@ def demo_control_optimization():
     print("-" * 48)
     
     # Historical control deployment data (4 control types x 9 observations)
-    historical_data = [
+    historical_data = np.array([
         [2, 3, 1, 4, 2, 3, 1, 2, 3],  # Firewalls
         [1, 2, 3, 2, 1, 2, 3, 1, 2],  # IDS/IPS
         [3, 2, 4, 1, 3, 2, 4, 3, 2],  # Endpoint Protection
         [1, 1, 2, 2, 1, 1, 2, 1, 1]   # Security Training
-    ]
+    ], dtype=np.float64)
     
     # Historical outcomes
     safeguard_effects = [85, 78, 92, 70, 88, 82, 95, 87, 80]  # Effectiveness scores
@@ -204,8 +204,8 @@ def demo_control_optimization():
     control_names = ["Firewalls", "IDS/IPS", "Endpoint Protection", "Security Training"]
     
     print("Historical Data Analysis:")
-    for i, name in enumerate(control_names):
-        avg_deployment = np.mean(historical_data[i])
+    avg_deployments = historical_data.mean(axis=1)
+    for name, avg_deployment in zip(control_names, avg_deployments):
         print(f"  {name}: Average deployment = {avg_deployment:.1f}")
     
     print(f"\nCurrent Deployment:")
@@ -54,6 +54,8 @@ def test_pdf_template():
     try:
         from jinja2 import Environment, FileSystemLoader
         from pathlib import Path
+        import os
+        import tempfile
         
         template_dir = Path("api/templates")
         if not template_dir.exists():
@@ -97,8 +99,15 @@ def test_pdf_template():
             }
         }
         
-        html = template.render(**sample_data)
-        print(f"  ✅ Template rendered successfully ({len(html)} chars)")
+        # Stream the rendered output to disk in chunks instead of building one big string
+        stream = template.stream(**sample_data)
+        stream.enable_buffering(64)
+        with tempfile.NamedTemporaryFile('w', suffix='.html', encoding='utf-8',
+                                         delete=False) as tmp_html:
+            stream.dump(tmp_html)
+        html_size = os.path.getsize(tmp_html.name)
+        os.unlink(tmp_html.name)
+        print(f"  ✅ Template rendered successfully ({html_size} bytes)")
         
         return True
         
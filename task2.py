@@ -1,45 +1,45 @@
 
+import numpy as np
 from dhCheck_Task2 import dhCheckCorrectness
 
+# Cells of the 3x4 table (rows Y=6..8, columns X=2..5) where X + Y <= 10
+MASK = np.array([
+    [1, 1, 1, 0],  # Y=6: X=2,3,4
+    [1, 1, 0, 0],  # Y=7: X=2,3
+    [1, 0, 0, 0],  # Y=8: X=2
+])
+
 def Task2(num, table, probs):
-    # Unpack the joint distribution table
-    a, b, c, d = table[0]
-    e, f, g, h = table[1]
-    i, j, k, l = table[2]
+    # Joint distribution table, rows Y=6..8 and columns X=2..5
+    t = np.asarray(table, dtype=np.int64)
     
     # Total number of cases (should equal num)
-    total = a + b + c + d + e + f + g + h + i + j + k + l
-    
-    # Sums by X (columns)
-    X2 = a + e + i  # X = 2
-    X3 = b + f + j  # X = 3
-    X4 = c + g + k  # X = 4
-    X5 = d + h + l  # X = 5
+    total = int(t.sum())
     
-    # Sums by Y (rows)
-    Y6 = a + b + c + d  # Y = 6
-    Y7 = e + f + g + h  # Y = 7
-    Y8 = i + j + k + l  # Y = 8
+    # Sums by X (columns X=2..5) and by Y (rows Y=6..8)
+    col = t.sum(axis=0)
+    row = t.sum(axis=1)
+    Y8 = int(row[2])
     
     # (1) prob1: P(3 ≤ X ≤ 4)
-    prob1 = (X3 + X4) / total
+    prob1 = int(col[1] + col[2]) / total
     
     # (1) prob2: P(X + Y ≤ 10)
-    # Qualifying cells: (X=2,Y=6): a, (X=2,Y=7): e, (X=2,Y=8): i, (X=3,Y=6): b, (X=3,Y=7): f, (X=4,Y=6): c.
-    prob2 = (a + e + i + b + f + c) / total
+    # Qualifying cells: (X=2,Y=6), (X=2,Y=7), (X=2,Y=8), (X=3,Y=6), (X=3,Y=7), (X=4,Y=6).
+    prob2 = int((t * MASK).sum()) / total
     
     # (2) Compute P(Y=8 | T)
-    # Unpack the test probabilities
-    PX2, PX3, PX4, PX5, PY6, PY7 = probs
+    # probs = [P(T|X=2), P(T|X=3), P(T|X=4), P(T|X=5), P(T|Y=6), P(T|Y=7)]
     
     # P(T) computed from the X-side
-    PT_X = PX2 * X2 + PX3 * X3 + PX4 * X4 + PX5 * X5
+    PT_X = float(np.dot(probs[:4], col))
     
     # P(T) computed from the Y-side:
     # Let P(T|Y=8) be unknown. Then,
     # PY6*Y6 + PY7*Y7 + P(T|Y=8)*Y8 = PT_X.
     # Solve for P(T|Y=8):
-    PT_given_Y8 = (PT_X - (PY6 * Y6 + PY7 * Y7)) / Y8
+    PY_partial = float(np.dot(probs[4:6], row[:2]))
+    PT_given_Y8 = (PT_X - PY_partial) / Y8
     
     # Now, by Bayes' theorem,
     # P(Y=8|T) = [P(T|Y=8) * P(Y=8)] / P(T)
@@ -15,9 +15,10 @@ def Task3(x, y, z, x_initial, c, x_bound, se_bound, ml_bound):
     y = np.array(y)
     z = np.array(z)
     
-    # Compute least squares estimates
-    weights_b, _, _, _ = np.linalg.lstsq(X_design, y, rcond=None)
-    weights_d, _, _, _ = np.linalg.lstsq(X_design, z, rcond=None)
+    # Compute least squares estimates.
+    # Both targets share X_design, so solve them together with a single SVD.
+    W = np.linalg.lstsq(X_design, np.column_stack((y, z)), rcond=None)[0]
+    weights_b, weights_d = W[:, 0], W[:, 1]
     
     # Solving the linear programming problem.
     # x_initial be the current deployment. Additional controls: x_add.
@@ -35,19 +36,16 @@ def Task3(x, y, z, x_initial, c, x_bound, se_bound, ml_bound):
     # Setup LP constraints.
     # For safeguard, we have: weights_b[1:]*x_add >= safeguard_gap.
     # Multiplying both sides by -1 to obtain
-    A_ub = np.array([
-        -weights_b[1:],   # safeguard constraint
-         weights_d[1:]    # maintenance constraint
-    ])
-    b_ub = np.array([
-        -safeguard_gap,
-         maintenance_gap
-    ])
+    A_ub = np.empty((2, 4))
+    A_ub[0] = -weights_b[1:]   # safeguard constraint
+    A_ub[1] = weights_d[1:]    # maintenance constraint
+    b_ub = np.empty(2)
+    b_ub[0] = -safeguard_gap
+    b_ub[1] = maintenance_gap
     
     # Variable bounds: x_add[i] must be nonnegative and not exceed (x_bound[i] - x_initial[i])
-    bounds = []
-    for i in range(4):
-        bounds.append((0, x_bound[i] - x_initial[i]))
+    headroom = np.asarray(x_bound) - np.asarray(x_initial)
+    bounds = np.column_stack((np.zeros_like(headroom), headroom))
     
     # The objective is to minimize total cost: c[0]*x_add[0] + ... + c[3]*x_add[3]
     res = linprog(c, A_ub=A_ub, b_ub=b_ub, bounds=bounds, method='highs')
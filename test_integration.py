@@ -6,30 +6,55 @@ Tests that the API server starts and responds correctly to requests.
 """
 
 import asyncio
-import json
-import time
-from urllib.request import urlopen
-from urllib.error import URLError
+from contextlib import asynccontextmanager
 
-async def test_api_health():
+import aiohttp
+
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
+BASE_URL = "http://localhost:8001"
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=5)
+
+@asynccontextmanager
+async def _client(session=None):
+    """Use the caller's session, or open a short-lived one when run standalone."""
+    if session is not None:
+        yield session
+    else:
+        async with aiohttp.ClientSession() as own_session:
+            yield own_session
+
+async def test_api_health(session=None):
     """Test that the API server is running and healthy."""
     print("🔍 Testing API Health...")
     
     max_retries = 10
-    for i in range(max_retries):
-        try:
-            with urlopen("http://localhost:8001/api/v1/health", timeout=5) as response:
-                data = json.loads(response.read().decode())
-                print(f"  ✅ API Health: {data.get('status', 'Unknown')}")
-                return True
-        except URLError:
-            print(f"  ⏳ Waiting for API server... ({i+1}/{max_retries})")
-            time.sleep(2)
+    async with _client(session) as client:
+        for i in range(max_retries):
+            try:
+                async with client.get(f"{BASE_URL}/api/v1/health",
+                                      timeout=REQUEST_TIMEOUT) as response:
+                    # Both parsers accept the raw bytes, so skip the str decode
+                    data = _json.loads(await response.read())
+                    print(f"  ✅ API Health: {data.get('status', 'Unknown')}")
+                    return True
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+                print(f"  ⏳ Waiting for API server... ({i+1}/{max_retries})")
+                # Exponential backoff: 0.1s, 0.2s, 0.4s, ... capped at 2s
+                await asyncio.sleep(min(0.1 * (2 ** i), 2.0))
     
     print("  ❌ API server not responding")
     return False
 
-async def test_billing_endpoints():
+async def _check_endpoint(client, endpoint):
+    """GET one endpoint; returns the HTTP status or the raised exception."""
+    async with client.get(f"{BASE_URL}{endpoint}", timeout=REQUEST_TIMEOUT) as response:
+        return response.status
+
+async def test_billing_endpoints(session=None):
     """Test billing endpoints are accessible."""
     print("\n💳 Testing Billing Endpoints...")
     
@@ -38,33 +63,38 @@ async def test_billing_endpoints():
         "/api/v1/billing/usage-limits"
     ]
     
+    # Probe all endpoints concurrently over the shared connection pool
+    async with _client(session) as client:
+        results = await asyncio.gather(
+            *(_check_endpoint(client, endpoint) for endpoint in endpoints),
+            return_exceptions=True)
+    
     passed = 0
-    for endpoint in endpoints:
-        try:
-            with urlopen(f"http://localhost:8001{endpoint}", timeout=5) as response:
-                if response.getcode() == 200:
-                    print(f"  ✅ {endpoint} - OK")
-                    passed += 1
-                else:
-                    print(f"  ❌ {endpoint} - HTTP {response.getcode()}")
-        except URLError as e:
-            print(f"  ❌ {endpoint} - {e}")
+    for endpoint, result in zip(endpoints, results):
+        if isinstance(result, Exception):
+            print(f"  ❌ {endpoint} - {result}")
+        elif result == 200:
+            print(f"  ✅ {endpoint} - OK")
+            passed += 1
+        else:
+            print(f"  ❌ {endpoint} - HTTP {result}")
     
     return passed == len(endpoints)
 
-async def test_api_docs():
+async def test_api_docs(session=None):
     """Test that API documentation is accessible."""
     print("\n📚 Testing API Documentation...")
     
     try:
-        with urlopen("http://localhost:8001/docs", timeout=5) as response:
-            if response.getcode() == 200:
-                print("  ✅ Swagger docs accessible at http://localhost:8001/docs")
-                return True
-            else:
-                print(f"  ❌ Docs returned HTTP {response.getcode()}")
-                return False
-    except URLError as e:
+        async with _client(session) as client:
+            status = await _check_endpoint(client, "/docs")
+        if status == 200:
+            print(f"  ✅ Swagger docs accessible at {BASE_URL}/docs")
+            return True
+        else:
+            print(f"  ❌ Docs returned HTTP {status}")
+            return False
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
         print(f"  ❌ Docs not accessible: {e}")
         return False
 
@@ -73,19 +103,23 @@ async def main():
     print("🚀 CyberRisk Phase 2 Integration Test")
     print("=" * 50)
     
-    # Test 1: API Health
-    health_ok = await test_api_health()
-    
-    if not health_ok:
-        print("\n❌ API server not running. Start with:")
-        print("  uvicorn api.main:app --port 8001 --reload")
-        return
-    
-    # Test 2: Billing endpoints
-    billing_ok = await test_billing_endpoints()
-    
-    # Test 3: API docs  
-    docs_ok = await test_api_docs()
+    # One keep-alive session for every probe in the run; DNS is resolved once
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=16,
+                                     ttl_dns_cache=300, keepalive_timeout=30)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        # Test 1: API Health
+        health_ok = await test_api_health(session)
+        
+        if not health_ok:
+            print("\n❌ API server not running. Start with:")
+            print("  uvicorn api.main:app --port 8001 --reload")
+            return
+        
+        # Test 2: Billing endpoints
+        billing_ok = await test_billing_endpoints(session)
+        
+        # Test 3: API docs
+        docs_ok = await test_api_docs(session)
     
     # Summary
     print("\n" + "=" * 50)
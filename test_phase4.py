@@ -7,30 +7,138 @@ threat intelligence, enterprise API management, and security features
 
 import asyncio
 import json
+import os
 import time
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Any
-import numpy as np
-from dataclasses import asdict
+from datetime import datetime, timezone
+from typing import Dict
+from dataclasses import dataclass
+from functools import cached_property
+from types import MappingProxyType
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+class _FastFormatter(logging.Formatter):
+    """'%(asctime)s - %(levelname)s - %(message)s' with the date part
+    rendered once per second instead of once per record"""
+    
+    def __init__(self):
+        super().__init__()
+        self._last_second = None
+        self._last_stamp = ""
+    
+    def format(self, record):
+        second = int(record.created)
+        if second != self._last_second:
+            self._last_second = second
+            self._last_stamp = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+        record.message = record.getMessage()
+        line = f"{self._last_stamp},{int(record.msecs):03d} - {record.levelname} - {record.message}"
+        # Traceback and stack handling as in logging.Formatter.format,
+        # including reuse of a traceback another handler already rendered
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if line[-1:] != "\n":
+                line += "\n"
+            line += record.exc_text
+        if record.stack_info:
+            if line[-1:] != "\n":
+                line += "\n"
+            line += self.formatStack(record.stack_info)
+        return line
+
+# Configure logging; like basicConfig, leave an already-configured root alone
+_root_logger = logging.getLogger()
+if not _root_logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(_FastFormatter())
+    _root_logger.addHandler(_handler)
+    _root_logger.setLevel(logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on categories running at once; CI can tune via the environment
+TEST_CONCURRENCY = max(1, int(os.environ.get("PHASE4_TEST_CONCURRENCY", "4")))
+
+# Static report content, built once at import
+SEP_EQ = "=" * 60
+SEP_DASH = "-" * 40
+REPORT_HEADER = f"\n{SEP_EQ}\nPHASE 4 TEST REPORT\n{SEP_EQ}"
+# Log output is plain ASCII (grep-friendly, no codec work on narrow
+# consoles); only the JSON report keeps emoji, for the UI
+STATUS_ICONS = {True: "[PASS]", False: "[FAIL]"}
+
+PHASE4_FEATURES = (
+    "AI-Powered Risk Assessment",
+    "Advanced Analytics Dashboard",
+    "Threat Intelligence Engine",
+    "Enterprise API Management",
+    "Role-Based Access Control (RBAC)",
+    "Audit Logging & Compliance",
+    "SSO Integration Support",
+    "Rate Limiting & API Keys",
+    "Real-time Threat Monitoring",
+    "Performance Optimization",
+    "Caching & Scalability",
+    "JWT Authentication"
+)
+
+ENTERPRISE_FEATURES = MappingProxyType({
+    'ai_risk_assessment': '✅ COMPLETE',
+    'advanced_analytics': '✅ COMPLETE',
+    'threat_intelligence': '✅ COMPLETE',
+    'enterprise_api_management': '✅ COMPLETE',
+    'rbac_security': '✅ COMPLETE',
+    'audit_logging': '✅ COMPLETE',
+    'sso_integration': '✅ COMPLETE',
+    'rate_limiting': '✅ COMPLETE',
+    'real_time_monitoring': '✅ COMPLETE',
+    'performance_optimization': '✅ COMPLETE',
+    'jwt_authentication': '✅ COMPLETE',
+    'machine_learning': '✅ COMPLETE'
+})
+
+@dataclass
+class _Summary:
+    """Pass/fail aggregates over test_results, each computed once on first access"""
+    results: Dict[str, str]
+    
+    @cached_property
+    def total(self) -> int:
+        return len(self.results)
+    
+    @cached_property
+    def passed(self) -> int:
+        # The only walk over the results: total is len() and failed derives
+        # from these two, so the summary stays a single pass
+        return list(self.results.values()).count("PASSED")
+    
+    @cached_property
+    def failed(self) -> int:
+        return self.total - self.passed
+    
+    @cached_property
+    def success_rate(self) -> float:
+        return (self.passed / self.total) * 100 if self.total else 0.0
+
 class Phase4Tester:
     """Comprehensive Phase 4 testing suite"""
     
     def __init__(self):
         self.test_results = {}
         self.start_time = None
+        self._category_slots = None
         
     async def run_all_tests(self):
         """Run all Phase 4 tests"""
         
         self.start_time = time.time()
-        logger.info("🚀 Starting Phase 4 Enterprise Features Test Suite")
-        logger.info("=" * 60)
+        logger.info("Starting Phase 4 Enterprise Features Test Suite")
+        logger.info(SEP_EQ)
         
         test_categories = [
             ("AI-Powered Risk Assessment", self.test_ai_risk_assessment),
@@ -42,131 +150,133 @@ class Phase4Tester:
             ("Integration Testing", self.test_integration)
         ]
         
-        for category, test_func in test_categories:
-            try:
-                logger.info(f"\n📋 Testing {category}")
-                logger.info("-" * 40)
-                await test_func()
+        # Categories are independent, so run them concurrently (at most
+        # TEST_CONCURRENCY at a time); gather keeps the results in category
+        # order for the summary
+        self._category_slots = asyncio.Semaphore(TEST_CONCURRENCY)
+        results = await asyncio.gather(
+            *(self._run_category(category, test_func) for category, test_func in test_categories)
+        )
+        
+        for category, error in results:
+            if error is None:
                 self.test_results[category] = "PASSED"
-                logger.info(f"✅ {category}: PASSED")
-            except Exception as e:
-                self.test_results[category] = f"FAILED: {str(e)}"
-                logger.error(f"❌ {category}: FAILED - {str(e)}")
+                logger.info(f"[PASS] {category}: PASSED")
+            else:
+                self.test_results[category] = f"FAILED: {str(error)}"
+                logger.error(f"[FAIL] {category}: FAILED - {str(error)}")
         
         await self.generate_test_report()
     
+    async def _run_category(self, category, test_func):
+        """Run one test category and return (category, exception or None)"""
+        async with self._category_slots:
+            try:
+                logger.info(f"\nTesting {category}\n{SEP_DASH}")
+                await test_func()
+                return category, None
+            except Exception as e:
+                return category, e
+    
     async def test_ai_risk_assessment(self):
         """Test AI-powered risk assessment features"""
-        logger.info("Testing AI risk assessment engine...")
-        
         # Simulate AI model testing for Phase 4
-        logger.info("✅ AI models initialized successfully")
-        logger.info("✅ Risk prediction: 6.25")
-        logger.info("✅ Model confidence: 0.85")
-        logger.info("✅ Recommendations: 5")
-        logger.info("✅ Threat landscape: 12 threats identified")
+        logger.info("\n".join([
+            "Testing AI risk assessment engine...",
+            "[PASS] AI models initialized successfully",
+            "[PASS] Risk prediction: 6.25",
+            "[PASS] Model confidence: 0.85",
+            "[PASS] Recommendations: 5",
+            "[PASS] Threat landscape: 12 threats identified"
+        ]))
     
     async def test_advanced_analytics(self):
         """Test advanced analytics dashboard features"""
-        logger.info("Testing advanced analytics dashboard...")
-        
         # Simulate analytics testing
-        logger.info("✅ Dashboard data: 3 metrics")
-        logger.info("✅ Real-time metrics: healthy status")
-        logger.info("✅ Analytics caching simulated successfully")
+        logger.info("\n".join([
+            "Testing advanced analytics dashboard...",
+            "[PASS] Dashboard data: 3 metrics",
+            "[PASS] Real-time metrics: healthy status",
+            "[PASS] Analytics caching simulated successfully"
+        ]))
     
     async def test_threat_intelligence(self):
         """Test threat intelligence engine"""
-        logger.info("Testing threat intelligence engine...")
-        
         # Simulate threat intelligence testing
-        logger.info("✅ Threat intelligence: 2 threats collected")
-        logger.info("✅ Organization threats: 2 relevant threats")
-        logger.info("✅ Threat categories: 1 ransomware, 1 vulnerabilities")
+        logger.info("\n".join([
+            "Testing threat intelligence engine...",
+            "[PASS] Threat intelligence: 2 threats collected",
+            "[PASS] Organization threats: 2 relevant threats",
+            "[PASS] Threat categories: 1 ransomware, 1 vulnerabilities"
+        ]))
     
     async def test_enterprise_api_management(self):
         """Test enterprise API management features"""
-        logger.info("Testing enterprise API management...")
-        
         # Simulate enterprise API testing
-        logger.info("✅ API key generation successful")
-        logger.info("✅ API key validation successful")
-        logger.info("✅ Rate limiting check successful")
-        logger.info("✅ Permission checking successful")
-        logger.info("✅ JWT token generation successful")
-        logger.info("✅ JWT token validation successful")
+        logger.info("\n".join([
+            "Testing enterprise API management...",
+            "[PASS] API key generation successful",
+            "[PASS] API key validation successful",
+            "[PASS] Rate limiting check successful",
+            "[PASS] Permission checking successful",
+            "[PASS] JWT token generation successful",
+            "[PASS] JWT token validation successful"
+        ]))
     
     async def test_security_features(self):
         """Test security and audit features"""
-        logger.info("Testing security and audit features...")
-        
         # Simulate security testing
-        logger.info("✅ Audit logging successful")
-        logger.info("✅ Audit log retrieval: 0 logs")
-        logger.info("✅ SSO configuration successful")
+        logger.info("\n".join([
+            "Testing security and audit features...",
+            "[PASS] Audit logging successful",
+            "[PASS] Audit log retrieval: 0 logs",
+            "[PASS] SSO configuration successful"
+        ]))
     
     async def test_performance_scalability(self):
         """Test performance and scalability features"""
-        logger.info("Testing performance and scalability...")
-        
         # Simulate performance testing
-        logger.info("✅ AI performance: 0.150s average per prediction")
-        logger.info("✅ Analytics performance: 0.325s dashboard generation")
-        logger.info("✅ Threat intelligence performance: 1.250s collection")
+        logger.info("\n".join([
+            "Testing performance and scalability...",
+            "[PASS] AI performance: 0.150s average per prediction",
+            "[PASS] Analytics performance: 0.325s dashboard generation",
+            "[PASS] Threat intelligence performance: 1.250s collection"
+        ]))
     
     async def test_integration(self):
         """Test integration between Phase 4 components"""
-        logger.info("Testing component integration...")
-        
         # Simulate integration testing
-        logger.info("✅ AI + Analytics integration successful")
-        logger.info("✅ Threat Intelligence + Enterprise Management integration successful")
-        logger.info("Testing end-to-end enterprise workflow...")
-        logger.info("✅ End-to-end enterprise workflow successful")
+        logger.info("\n".join([
+            "Testing component integration...",
+            "[PASS] AI + Analytics integration successful",
+            "[PASS] Threat Intelligence + Enterprise Management integration successful",
+            "Testing end-to-end enterprise workflow...",
+            "[PASS] End-to-end enterprise workflow successful"
+        ]))
     
     async def generate_test_report(self):
         """Generate comprehensive test report"""
         
         total_time = time.time() - self.start_time
-        total_tests = len(self.test_results)
-        passed_tests = len([r for r in self.test_results.values() if r == "PASSED"])
-        failed_tests = total_tests - passed_tests
-        success_rate = (passed_tests / total_tests) * 100
-        
-        logger.info("\n" + "=" * 60)
-        logger.info("📊 PHASE 4 TEST REPORT")
-        logger.info("=" * 60)
-        logger.info(f"Total Tests: {total_tests}")
-        logger.info(f"Passed: {passed_tests}")
-        logger.info(f"Failed: {failed_tests}")
-        logger.info(f"Success Rate: {success_rate:.1f}%")
+        summary = _Summary(self.test_results)
+        
+        logger.info(REPORT_HEADER)
+        logger.info(f"Total Tests: {summary.total}")
+        logger.info(f"Passed: {summary.passed}")
+        logger.info(f"Failed: {summary.failed}")
+        logger.info(f"Success Rate: {summary.success_rate:.1f}%")
         logger.info(f"Total Duration: {total_time:.2f} seconds")
         
-        logger.info("\n📋 Detailed Results:")
-        for category, result in self.test_results.items():
-            status_icon = "✅" if result == "PASSED" else "❌"
-            logger.info(f"  {status_icon} {category}: {result}")
-        
-        logger.info("\n🎯 Phase 4 Implementation Status:")
-        phase4_features = [
-            "AI-Powered Risk Assessment",
-            "Advanced Analytics Dashboard", 
-            "Threat Intelligence Engine",
-            "Enterprise API Management",
-            "Role-Based Access Control (RBAC)",
-            "Audit Logging & Compliance",
-            "SSO Integration Support",
-            "Rate Limiting & API Keys",
-            "Real-time Threat Monitoring",
-            "Performance Optimization",
-            "Caching & Scalability",
-            "JWT Authentication"
-        ]
+        logger.info("\n".join([
+            "\nDetailed Results:",
+            *(f"  {STATUS_ICONS[result == 'PASSED']} {category}: {result}"
+              for category, result in self.test_results.items())
+        ]))
         
-        for feature in phase4_features:
-            logger.info(f"  ✅ COMPLETE {feature}")
+        logger.info("\nPhase 4 Implementation Status:")
+        logger.info("\n".join(f"  [DONE] {feature}" for feature in PHASE4_FEATURES))
         
-        logger.info("\n💡 Next Steps & Recommendations:")
+        logger.info("\nNext Steps & Recommendations:")
         logger.info("  1. Deploy to production environment with enterprise configuration")
         logger.info("  2. Configure real threat intelligence feeds")
         logger.info("  3. Set up Redis for production rate limiting and caching")
@@ -178,42 +288,36 @@ class Phase4Tester:
         
         # Save detailed report
         report_data = {
-            'timestamp': datetime.utcnow().isoformat(),
+            'timestamp': datetime.now(timezone.utc),
             'duration': total_time,
             'results': self.test_results,
             'summary': {
-                'total_tests': total_tests,
-                'passed': passed_tests,
-                'failed': failed_tests,
-                'success_rate': success_rate
+                'total_tests': summary.total,
+                'passed': summary.passed,
+                'failed': summary.failed,
+                'success_rate': summary.success_rate
             },
-            'enterprise_features': {
-                'ai_risk_assessment': '✅ COMPLETE',
-                'advanced_analytics': '✅ COMPLETE',
-                'threat_intelligence': '✅ COMPLETE',
-                'enterprise_api_management': '✅ COMPLETE',
-                'rbac_security': '✅ COMPLETE',
-                'audit_logging': '✅ COMPLETE',
-                'sso_integration': '✅ COMPLETE',
-                'rate_limiting': '✅ COMPLETE',
-                'real_time_monitoring': '✅ COMPLETE',
-                'performance_optimization': '✅ COMPLETE',
-                'jwt_authentication': '✅ COMPLETE',
-                'machine_learning': '✅ COMPLETE'
-            }
+            'enterprise_features': dict(ENTERPRISE_FEATURES)
         }
         
-        with open('phase4_test_report.json', 'w') as f:
-            json.dump(report_data, f, indent=2)
+        # orjson serializes the aware timestamp natively; the stdlib fallback
+        # needs it converted to the same ISO 8601 string
+        if ORJSON_AVAILABLE:
+            with open('phase4_test_report.json', 'wb') as f:
+                f.write(orjson.dumps(report_data, option=orjson.OPT_INDENT_2))
+        else:
+            # Serialize first: one write call instead of one per encoded chunk
+            with open('phase4_test_report.json', 'w') as f:
+                f.write(json.dumps(report_data, indent=2, default=datetime.isoformat))
         
-        logger.info(f"\n📄 Detailed report saved to: phase4_test_report.json")
+        logger.info(f"\nDetailed report saved to: phase4_test_report.json")
         
-        if failed_tests > 0:
-            logger.info(f"\n⚠️  {failed_tests} test(s) failed. Review and fix before production deployment.")
+        if summary.failed > 0:
+            logger.info(f"\n[WARN] {summary.failed} test(s) failed. Review and fix before production deployment.")
         else:
-            logger.info(f"\n🎉 ALL TESTS PASSED! Phase 4 is ready for enterprise deployment!")
+            logger.info(f"\nALL TESTS PASSED! Phase 4 is ready for enterprise deployment!")
         
-        logger.info("=" * 60)
+        logger.info(SEP_EQ)
 
 async def main():
     """Main test execution"""